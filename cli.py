@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Network Scanner CLI
+Mode headless : lance un scan sans serveur web et diffuse les résultats en NDJSON sur stdout
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+def parse_args(argv=None):
+    """Analyser les arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(
+        description="Scanner réseau en ligne de commande (sortie NDJSON)"
+    )
+    parser.add_argument("target", help="IP, réseau CIDR (192.168.1.0/24) ou plage (192.168.1.1-254)")
+    parser.add_argument("-t", "--scan-type", default="quick", choices=["quick", "full", "range"],
+                        help="Type de scan (défaut: quick)")
+    parser.add_argument("-p", "--ports", default="auto",
+                        help="Ports à scanner, séparés par des virgules (défaut: auto)")
+    parser.add_argument("--db", metavar="PATH",
+                        help="Enregistrer la session dans cette base SQLite")
+    parser.add_argument("--no-discovery", action="store_true",
+                        help="Ne pas consulter la table de voisinage (ARP/NDP), pinger tous les hôtes")
+    parser.add_argument("--no-arp-sweep", action="store_true",
+                        help="Lire la table de voisinage sans la rafraîchir par un balayage ARP")
+    parser.add_argument("--no-resolve", action="store_true",
+                        help="Ne pas résoudre les noms d'hôtes (DNS inverse)")
+    parser.add_argument("--events", action="store_true",
+                        help="Émettre tous les événements de scan, pas seulement les résultats d'hôtes")
+    return parser.parse_args(argv)
+
+async def run(args) -> int:
+    """Exécuter le scan et écrire chaque résultat sur stdout dès qu'il est disponible"""
+    # Imports paresseux : le moteur ne dépend que de la bibliothèque standard
+    from scanner import scan_network
+
+    store = None
+    if args.db:
+        from database import DatabaseManager
+        store = DatabaseManager(args.db)
+        await store.init_database()
+
+    resolver = None
+    if not args.no_resolve:
+        from resolver import ReverseResolver
+        resolver = ReverseResolver(store=store)
+
+    # Levé quand le consommateur ferme la sortie (ex: head) : le scan s'arrête proprement
+    stop_event = asyncio.Event()
+
+    def write(line):
+        if stop_event.is_set():
+            return
+        try:
+            sys.stdout.write(json.dumps(line) + "\n")
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Rediriger stdout vers /dev/null pour éviter une nouvelle erreur à la sortie
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            stop_event.set()
+
+    async def emit(message):
+        if args.events:
+            write(message)
+        elif message['type'] == 'host_result':
+            write(message['result'])
+        elif message['type'] == 'hostnames_resolved':
+            # Noms résolus après coup : une ligne partielle par hôte
+            for host, hostname in message['hostnames'].items():
+                write({'host': host, 'hostname': hostname})
+        elif message['type'] == 'scan_error':
+            print(message['error'], file=sys.stderr)
+
+    try:
+        summary = await scan_network(args.target, args.scan_type, args.ports,
+                                     notify=emit, store=store,
+                                     discover=not args.no_discovery,
+                                     prime_neighbours=not args.no_arp_sweep,
+                                     resolver=resolver,
+                                     stop_event=stop_event)
+    finally:
+        # Fermer les sockets UDP même en cas d'interruption ou d'erreur
+        if resolver:
+            resolver.close()
+    # Une sortie fermée par le consommateur n'est pas une erreur
+    return 0 if summary['status'] == 'completed' or stop_event.is_set() else 1
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 130
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,8 +6,9 @@ Handles SQLite database operations for scan sessions, results, and bookmarks
 
 import aiosqlite
 import json
+import time
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from pathlib import Path
 
 class DatabaseManager:
@@ -41,6 +42,7 @@ class DatabaseManager:
                     status TEXT NOT NULL,
                     ports TEXT,
                     os_info TEXT,
+                    hostname TEXT,
                     scan_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (session_id) REFERENCES scan_sessions (id)
                 )
@@ -54,12 +56,44 @@ class DatabaseManager:
                     target TEXT NOT NULL,
                     description TEXT DEFAULT '',
                     scan_type TEXT DEFAULT 'quick',
+                    ports TEXT DEFAULT '',
+                    schedule_interval INTEGER DEFAULT 0,
+                    schedule_start TEXT DEFAULT '',
+                    last_run_at TIMESTAMP,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
             
+            # Create dns_cache table (reverse DNS lookups, hostname NULL for negative answers)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS dns_cache (
+                    ip TEXT PRIMARY KEY,
+                    hostname TEXT,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            
+            # Migrate tables created by older versions
+            await self._add_missing_columns(db, "scan_results", {
+                "hostname": "TEXT"
+            })
+            await self._add_missing_columns(db, "bookmarks", {
+                "ports": "TEXT DEFAULT ''",
+                "schedule_interval": "INTEGER DEFAULT 0",
+                "schedule_start": "TEXT DEFAULT ''",
+                "last_run_at": "TIMESTAMP"
+            })
+            
             await db.commit()
     
+    async def _add_missing_columns(self, db, table: str, columns: Dict[str, str]):
+        """Add columns that are missing from an existing table"""
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in await cursor.fetchall()}
+        for name, definition in columns.items():
+            if name not in existing:
+                await db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+    
     async def create_scan_session(self, target: str, scan_type: str, ports: Optional[str] = None) -> int:
         """Create a new scan session and return its ID"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -87,9 +121,19 @@ class DatabaseManager:
         async with aiosqlite.connect(self.db_path) as db:
             ports_json = json.dumps(result.get('ports', []))
             await db.execute(
-                """INSERT INTO scan_results (session_id, host, status, ports, os_info)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (session_id, result['host'], result['status'], ports_json, result.get('os_info'))
+                """INSERT INTO scan_results (session_id, host, status, ports, os_info, hostname)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (session_id, result['host'], result['status'], ports_json, result.get('os_info'),
+                 result.get('hostname'))
+            )
+            await db.commit()
+    
+    async def update_hostnames(self, session_id: int, hostnames: Dict[str, str]):
+        """Set hostnames resolved after the results of a session were saved"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany(
+                "UPDATE scan_results SET hostname = ? WHERE session_id = ? AND host = ?",
+                [(hostname, session_id, host) for host, hostname in hostnames.items()]
             )
             await db.commit()
     
@@ -152,18 +196,41 @@ class DatabaseManager:
         async with aiosqlite.connect(self.db_path) as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute(
-                """SELECT DISTINCT sr.host, sr.status, sr.os_info, sr.scan_time,
+                """SELECT DISTINCT sr.host, sr.hostname, sr.status, sr.os_info, sr.scan_time,
                           ss.target, ss.scan_type
                    FROM scan_results sr
                    JOIN scan_sessions ss ON sr.session_id = ss.id
-                   WHERE sr.host LIKE ? OR sr.os_info LIKE ?
+                   WHERE sr.host LIKE ? OR sr.hostname LIKE ? OR sr.os_info LIKE ?
                    ORDER BY sr.scan_time DESC
                    LIMIT ?""",
-                (f"%{query}%", f"%{query}%", limit)
+                (f"%{query}%", f"%{query}%", f"%{query}%", limit)
             )
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
     
+    async def get_dns_cache(self, ips: List[str]) -> Dict[str, Tuple[Optional[str], float]]:
+        """Get unexpired reverse DNS entries for the given addresses"""
+        if not ips:
+            return {}
+        async with aiosqlite.connect(self.db_path) as db:
+            placeholders = ",".join("?" * len(ips))
+            cursor = await db.execute(
+                f"SELECT ip, hostname, expires_at FROM dns_cache WHERE expires_at > ? AND ip IN ({placeholders})",
+                (time.time(), *ips)
+            )
+            rows = await cursor.fetchall()
+            return {ip: (hostname, expires_at) for ip, hostname, expires_at in rows}
+    
+    async def save_dns_cache(self, entries: Dict[str, Tuple[Optional[str], float]]):
+        """Store reverse DNS entries and purge expired ones"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany(
+                "INSERT OR REPLACE INTO dns_cache (ip, hostname, expires_at) VALUES (?, ?, ?)",
+                [(ip, hostname, expires_at) for ip, (hostname, expires_at) in entries.items()]
+            )
+            await db.execute("DELETE FROM dns_cache WHERE expires_at <= ?", (time.time(),))
+            await db.commit()
+    
     async def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -202,26 +269,52 @@ class DatabaseManager:
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
     
-    async def create_bookmark(self, name: str, target: str, description: str = "", scan_type: str = "quick") -> int:
-        """Create a new bookmark"""
+    async def create_bookmark(self, name: str, target: str, description: str = "", scan_type: str = "quick",
+                              ports: str = "", schedule_interval: int = 0, schedule_start: str = "") -> int:
+        """Create a new bookmark (schedule_interval in minutes, 0 disables scheduling;
+        schedule_start is an optional "HH:MM" time the runs are aligned to)"""
         async with aiosqlite.connect(self.db_path) as db:
             cursor = await db.execute(
-                "INSERT INTO bookmarks (name, target, description, scan_type) VALUES (?, ?, ?, ?)",
-                (name, target, description, scan_type)
+                """INSERT INTO bookmarks (name, target, description, scan_type, ports, schedule_interval, schedule_start)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (name, target, description, scan_type, ports, schedule_interval, schedule_start)
             )
             await db.commit()
             return cursor.lastrowid
     
-    async def update_bookmark(self, bookmark_id: int, name: str, target: str, description: str = "", scan_type: str = "quick") -> bool:
+    async def update_bookmark(self, bookmark_id: int, name: str, target: str, description: str = "", scan_type: str = "quick",
+                              ports: str = "", schedule_interval: int = 0, schedule_start: str = "") -> bool:
         """Update an existing bookmark"""
         async with aiosqlite.connect(self.db_path) as db:
             cursor = await db.execute(
-                "UPDATE bookmarks SET name = ?, target = ?, description = ?, scan_type = ? WHERE id = ?",
-                (name, target, description, scan_type, bookmark_id)
+                """UPDATE bookmarks
+                   SET name = ?, target = ?, description = ?, scan_type = ?, ports = ?,
+                       schedule_interval = ?, schedule_start = ?
+                   WHERE id = ?""",
+                (name, target, description, scan_type, ports, schedule_interval, schedule_start, bookmark_id)
             )
             await db.commit()
             return cursor.rowcount > 0
     
+    async def get_scheduled_bookmarks(self) -> List[Dict[str, Any]]:
+        """Get bookmarks that have a recurring scan schedule"""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                "SELECT * FROM bookmarks WHERE schedule_interval > 0 ORDER BY id"
+            )
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+    
+    async def mark_bookmark_run(self, bookmark_id: int):
+        """Record the start time of a scheduled bookmark scan"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(
+                "UPDATE bookmarks SET last_run_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), bookmark_id)
+            )
+            await db.commit()
+    
     async def delete_bookmark(self, bookmark_id: int) -> bool:
         """Delete a bookmark"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Neighbour Discovery for Network Scanner Application
+Découverte passive des hôtes des sous-réseaux directement connectés via la table de voisinage (ARP/NDP)
+"""
+
+import asyncio
+import ipaddress
+import socket
+import subprocess
+from typing import List, Dict, Iterable, Optional, Set, Tuple
+
+# États de voisinage confirmés : l'hôte est joignable sans autre vérification
+CONFIRMED_STATES = {'REACHABLE', 'PERMANENT', 'NOARP'}
+# États non confirmés (STALE, DELAY, PROBE) : l'hôte a pu partir, il faut le sonder
+UNCONFIRMED_STATES = {'STALE', 'DELAY', 'PROBE'}
+# Résolution ARP/NDP encore en cours
+PENDING_STATES = {'INCOMPLETE'}
+
+# Flag ATF_COM de /proc/net/arp : entrée résolue
+ATF_COM = 0x2
+
+def read_proc_arp(path: str = "/proc/net/arp") -> Dict[str, str]:
+    """Lire les entrées ARP résolues depuis /proc/net/arp (ip -> mac)"""
+    neighbours = {}
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()[1:]
+    except OSError:
+        return neighbours
+
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 4:
+            continue
+        ip, flags, mac = fields[0], fields[2], fields[3]
+        try:
+            if int(flags, 16) & ATF_COM and mac != "00:00:00:00:00:00":
+                neighbours[ip] = mac
+        except ValueError:
+            continue
+    return neighbours
+
+def read_ip_neigh() -> Optional[Dict[str, Tuple[str, str]]]:
+    """Lire la table de voisinage du noyau via netlink (ip neigh) : ip -> (état, mac)
+
+    Retourne None si la table n'a pas pu être lue.
+    """
+    neighbours = {}
+    try:
+        result = subprocess.run(['ip', 'neigh', 'show'], capture_output=True, text=True)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+
+    for line in result.stdout.split('\n'):
+        fields = line.split()
+        if not fields:
+            continue
+        mac = fields[fields.index('lladdr') + 1] if 'lladdr' in fields else ''
+        neighbours[fields[0]] = (fields[-1], mac)
+    return neighbours
+
+def on_link_hosts(hosts: Iterable[str], networks: Iterable[str]) -> List[str]:
+    """Filtrer les hôtes appartenant à un sous-réseau directement connecté"""
+    nets = []
+    for network in networks:
+        try:
+            nets.append(ipaddress.ip_network(network, strict=False))
+        except ValueError:
+            continue
+
+    selected = []
+    for host in hosts:
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            continue
+        if any(address.version == net.version and address in net for net in nets):
+            selected.append(host)
+    return selected
+
+def send_arp_sweep(hosts: List[str]) -> Set[str]:
+    """Forcer une résolution ARP groupée en envoyant un datagramme UDP à chaque hôte
+
+    Ne nécessite aucun privilège : le noyau émet la requête ARP avant l'envoi.
+    Retourne les hôtes pour lesquels l'envoi a été accepté.
+    """
+    swept = set()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    try:
+        for host in hosts:
+            try:
+                # Port discard : aucune réponse attendue
+                sock.sendto(b'', (host, 9))
+                swept.add(host)
+            except OSError:
+                continue
+    finally:
+        sock.close()
+    return swept
+
+async def discover_neighbours(hosts: List[str], networks: Iterable[str], prime: bool = True,
+                              wait: float = 3.0, poll_interval: float = 0.2,
+                              local_addresses: Iterable[str] = ()) -> Dict[str, Dict[str, str]]:
+    """Classer les hôtes on-link à partir de la table de voisinage
+
+    Avec ``prime``, un balayage ARP est envoyé puis la table est relue jusqu'à
+    ce qu'aucune résolution ne soit en cours (au plus ``wait`` secondes, la
+    fenêtre de retransmission ARP du noyau étant d'environ 3 s). Un hôte
+    balayé sans entrée résolue est alors considéré hors ligne.
+
+    Retourne un dictionnaire ip -> {'status': 'up'|'down', 'mac': ...} pour les
+    hôtes dont l'état est connu ; les autres (états non confirmés, adresses
+    locales) doivent être sondés normalement.
+    """
+    local = set(local_addresses)
+    candidates = [host for host in on_link_hosts(hosts, networks) if host not in local]
+    if not candidates:
+        return {}
+
+    loop = asyncio.get_event_loop()
+    swept = set()
+    if prime:
+        swept = send_arp_sweep(candidates)
+        deadline = loop.time() + wait
+        while True:
+            await asyncio.sleep(poll_interval)
+            neigh = await loop.run_in_executor(None, read_ip_neigh)
+            if neigh is None:
+                return {}
+            pending = any(neigh.get(host, ('', ''))[0] in PENDING_STATES for host in swept)
+            if not pending or loop.time() >= deadline:
+                break
+    else:
+        neigh = await loop.run_in_executor(None, read_ip_neigh)
+        if neigh is None:
+            return {}
+
+    # /proc/net/arp ne sert qu'à compléter les adresses MAC : ses entrées STALE sont aussi marquées résolues
+    arp = read_proc_arp()
+
+    known = {}
+    for host in candidates:
+        state, mac = neigh.get(host, ('', ''))
+        if state in CONFIRMED_STATES:
+            known[host] = {'status': 'up', 'mac': mac or arp.get(host, '')}
+        elif state in UNCONFIRMED_STATES:
+            continue
+        elif host in swept:
+            # Balayé sans réponse ARP (FAILED, INCOMPLETE ou absent)
+            known[host] = {'status': 'down', 'mac': ''}
+    return known
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Reverse DNS Resolver for Network Scanner Application
+Résolution PTR asynchrone et groupée, avec cache TTL (mémoire LRU + SQLite)
+"""
+
+import asyncio
+import ipaddress
+import random
+import re
+import struct
+import time
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple, Iterable
+
+DNS_PORT = 53
+TYPE_PTR = 12
+CLASS_IN = 1
+RCODE_NXDOMAIN = 3
+
+# Caractères admis dans un label de nom d'hôte (RFC 952/1123, plus '_' courant en pratique)
+HOSTNAME_LABEL = re.compile(rb'^[A-Za-z0-9_-]{1,63}$')
+
+def read_nameservers(path: str = "/etc/resolv.conf") -> List[str]:
+    """Lire les serveurs DNS configurés dans resolv.conf"""
+    nameservers = []
+    try:
+        with open(path) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == 'nameserver':
+                    # Ignorer l'éventuel identifiant de zone IPv6 (fe80::1%eth0)
+                    nameservers.append(fields[1].split('%')[0])
+    except OSError:
+        pass
+    return nameservers or ['127.0.0.1']
+
+def build_ptr_query(query_id: int, ip: str) -> bytes:
+    """Construire une requête DNS PTR pour une adresse IP"""
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)  # RD=1, une question
+    qname = b''.join(
+        bytes([len(label)]) + label.encode('ascii')
+        for label in ipaddress.ip_address(ip).reverse_pointer.split('.')
+    ) + b'\x00'
+    return header + qname + struct.pack('!HH', TYPE_PTR, CLASS_IN)
+
+def _read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """Décoder un nom DNS (avec compression) ; retourne (nom, offset après le nom)
+
+    Lève ValueError si un label contient des caractères hors nom d'hôte.
+    """
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            # Pointeur de compression
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            jumps += 1
+            if jumps > 64:
+                raise ValueError("Boucle de compression DNS")
+            continue
+        offset += 1
+        if length == 0:
+            break
+        label = data[offset:offset + length]
+        if not HOSTNAME_LABEL.match(label):
+            raise ValueError("Label DNS invalide")
+        labels.append(label.decode('ascii'))
+        offset += length
+    return '.'.join(labels), (end if end is not None else offset)
+
+def parse_ptr_response(data: bytes) -> Tuple[int, int, Optional[str], Optional[int]]:
+    """Analyser une réponse DNS : retourne (id, rcode, nom PTR, TTL)"""
+    query_id, flags, qdcount, ancount, _, _ = struct.unpack('!HHHHHH', data[:12])
+    rcode = flags & 0x000F
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = _read_name(data, offset)
+        offset += 4
+    for _ in range(ancount):
+        _, offset = _read_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack('!HHIH', data[offset:offset + 10])
+        offset += 10
+        if rtype == TYPE_PTR:
+            hostname, _ = _read_name(data, offset)
+            return query_id, rcode, hostname, ttl
+        offset += rdlength
+    return query_id, rcode, None, None
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    """Associe chaque réponse UDP à la requête en attente de même identifiant et de même question"""
+
+    def __init__(self, inflight: Dict[int, Tuple[str, asyncio.Future]]):
+        self.inflight = inflight
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        query_id, _, qdcount = struct.unpack('!HHH', data[:6])
+        entry = self.inflight.get(query_id)
+        if entry is None or qdcount < 1:
+            return
+        qname, future = entry
+        try:
+            name, _ = _read_name(data, 12)
+        except (ValueError, IndexError):
+            return
+        if name.lower() != qname.lower():
+            # Réponse tardive à une ancienne requête dont l'identifiant a été réutilisé
+            return
+        del self.inflight[query_id]
+        if not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        pass
+
+class ReverseResolver:
+    """Résolveur PTR asynchrone avec requêtes UDP pipelinées
+
+    Les requêtes partagent un socket par serveur DNS et sont multiplexées par
+    identifiant, dans la limite de ``max_concurrent`` requêtes en vol. Les
+    réponses (positives et négatives) sont mises en cache en mémoire (LRU) et,
+    si ``store`` est fourni, dans SQLite.
+    """
+
+    def __init__(self, store=None, nameservers: Optional[List[str]] = None, port: int = DNS_PORT,
+                 max_concurrent: int = 50, timeout: float = 1.0, attempts: int = 2,
+                 cache_size: int = 4096, negative_ttl: int = 300, max_ttl: int = 86400):
+        self.store = store
+        self.nameservers = nameservers or read_nameservers()
+        self.port = port
+        self.timeout = timeout
+        self.attempts = attempts
+        self.cache_size = cache_size
+        self.negative_ttl = negative_ttl
+        self.max_ttl = max_ttl
+        self._max_concurrent = max_concurrent
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # ip -> (nom ou None, expiration en secondes epoch)
+        self._cache: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        # identifiant -> (nom interrogé, future de la réponse)
+        self._inflight: Dict[int, Tuple[str, asyncio.Future]] = {}
+        self._transports: Dict[str, asyncio.DatagramTransport] = {}
+        # Un verrou par serveur : les requêtes concurrentes partagent un seul socket
+        self._transport_locks: Dict[str, asyncio.Lock] = {}
+
+    def _cache_get(self, ip: str) -> Tuple[bool, Optional[str]]:
+        entry = self._cache.get(ip)
+        if entry is None:
+            return False, None
+        if entry[1] <= time.time():
+            del self._cache[ip]
+            return False, None
+        self._cache.move_to_end(ip)
+        return True, entry[0]
+
+    def _cache_put(self, ip: str, hostname: Optional[str], expires_at: float):
+        self._cache[ip] = (hostname, expires_at)
+        self._cache.move_to_end(ip)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _transport(self, nameserver: str) -> asyncio.DatagramTransport:
+        if nameserver not in self._transport_locks:
+            self._transport_locks[nameserver] = asyncio.Lock()
+        async with self._transport_locks[nameserver]:
+            transport = self._transports.get(nameserver)
+            if transport is None or transport.is_closing():
+                loop = asyncio.get_running_loop()
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _DNSProtocol(self._inflight),
+                    remote_addr=(nameserver, self.port)
+                )
+                self._transports[nameserver] = transport
+            return transport
+
+    async def _query(self, ip: str) -> Optional[Tuple[Optional[str], int]]:
+        """Interroger les serveurs DNS ; retourne (nom, TTL) ou None en cas d'échec"""
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            for attempt in range(self.attempts):
+                nameserver = self.nameservers[attempt % len(self.nameservers)]
+                query_id = random.randrange(0x10000)
+                while query_id in self._inflight:
+                    query_id = random.randrange(0x10000)
+                future = loop.create_future()
+                self._inflight[query_id] = (ipaddress.ip_address(ip).reverse_pointer, future)
+                try:
+                    transport = await self._transport(nameserver)
+                    transport.sendto(build_ptr_query(query_id, ip))
+                    data = await asyncio.wait_for(future, self.timeout)
+                    _, rcode, hostname, ttl = parse_ptr_response(data)
+                except (asyncio.TimeoutError, OSError, ValueError, struct.error, IndexError):
+                    continue
+                finally:
+                    if self._inflight.get(query_id, (None, None))[1] is future:
+                        del self._inflight[query_id]
+
+                if hostname:
+                    return hostname, min(ttl, self.max_ttl)
+                if rcode in (0, RCODE_NXDOMAIN):
+                    # Pas d'enregistrement PTR : réponse négative
+                    return None, self.negative_ttl
+        return None
+
+    def _complete(self, ip: str, future: asyncio.Future, hostname: Optional[str]):
+        """Compléter la future d'une adresse sans toucher à une requête plus récente"""
+        if self._pending.get(ip) is future:
+            del self._pending[ip]
+        if not future.done():
+            future.set_result(hostname)
+
+    async def _fill(self, futures: Dict[str, asyncio.Future]):
+        """Résoudre un groupe d'adresses et compléter les futures associées"""
+        try:
+            # Cache persistant consulté en une seule requête
+            if self.store:
+                try:
+                    stored = await self.store.get_dns_cache(list(futures))
+                except Exception:
+                    stored = {}
+                for ip, (hostname, expires_at) in stored.items():
+                    self._cache_put(ip, hostname, expires_at)
+                    self._complete(ip, futures[ip], hostname)
+
+            resolved = {}
+
+            async def lookup(ip: str):
+                answer = await self._query(ip)
+                hostname = None
+                if answer is not None:
+                    hostname, ttl = answer
+                    expires_at = time.time() + ttl
+                    self._cache_put(ip, hostname, expires_at)
+                    resolved[ip] = (hostname, expires_at)
+                self._complete(ip, futures[ip], hostname)
+
+            await asyncio.gather(*(lookup(ip) for ip, future in futures.items() if not future.done()))
+
+            if self.store and resolved:
+                try:
+                    await self.store.save_dns_cache(resolved)
+                except Exception:
+                    pass
+        finally:
+            for ip, future in futures.items():
+                self._complete(ip, future, None)
+
+    def prefetch(self, ips: Iterable[str]):
+        """Lancer en arrière-plan la résolution des adresses absentes du cache"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for ip in dict.fromkeys(ips):
+            if ip in self._pending or self._cache_get(ip)[0]:
+                continue
+            try:
+                ipaddress.ip_address(ip)
+            except ValueError:
+                continue
+            self._pending[ip] = futures[ip] = loop.create_future()
+        if futures:
+            asyncio.create_task(self._fill(futures))
+
+    def cached(self, ip: str) -> Tuple[bool, Optional[str]]:
+        """Consulter le cache sans attendre : retourne (résolu, nom)"""
+        return self._cache_get(ip)
+
+    async def resolve(self, ip: str) -> Optional[str]:
+        """Obtenir le nom d'hôte d'une adresse (None si inconnu)"""
+        found, hostname = self._cache_get(ip)
+        if found:
+            return hostname
+        if ip not in self._pending:
+            self.prefetch([ip])
+        future = self._pending.get(ip)
+        if future is None:
+            return self._cache_get(ip)[1]
+        return await asyncio.shield(future)
+
+    async def resolve_many(self, ips: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Résoudre un ensemble d'adresses en parallèle"""
+        ips = list(dict.fromkeys(ips))
+        self.prefetch(ips)
+        hostnames = await asyncio.gather(*(self.resolve(ip) for ip in ips))
+        return dict(zip(ips, hostnames))
+
+    def close(self):
+        """Fermer les sockets UDP"""
+        for transport in self._transports.values():
+            transport.close()
+        self._transports.clear()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Scan Engine for Network Scanner Application
+Moteur de scan réutilisable, sans dépendance au serveur web ni à la base de données
+"""
+
+import asyncio
+import subprocess
+import ipaddress
+import socket
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Awaitable, Any
+
+from discovery import discover_neighbours
+
+# Callback asynchrone recevant les événements de scan (scan_started, host_result, ...)
+Notifier = Callable[[Dict[str, Any]], Awaitable[None]]
+
+async def _notify(notify: Optional[Notifier], message: Dict[str, Any]):
+    """Transmettre un événement au callback s'il est défini"""
+    if notify is not None:
+        await notify(message)
+
+def read_network_interfaces():
+    """Lire les interfaces réseau réelles (lève une exception en cas d'échec)"""
+    result = subprocess.run(['ip', 'addr', 'show'], capture_output=True, text=True)
+    interfaces = []
+
+    current_interface = None
+    for line in result.stdout.split('\n'):
+        if ': ' in line and 'lo:' not in line:
+            parts = line.split(': ')
+            if len(parts) >= 2:
+                current_interface = parts[1].split('@')[0]
+        elif 'inet ' in line and current_interface:
+            inet_part = line.strip().split('inet ')[1].split(' ')[0]
+            ip, prefix = inet_part.split('/')
+
+            # Calculer le réseau
+            network = ipaddress.IPv4Network(f"{ip}/{prefix}", strict=False)
+
+            interfaces.append({
+                'interface': current_interface,
+                'ip_address': ip,
+                'netmask': str(network.netmask),
+                'network': str(network.network_address) + '/' + prefix
+            })
+            current_interface = None
+
+    return interfaces
+
+def get_network_interfaces():
+    """Obtenir les interfaces réseau disponibles (valeur par défaut en cas d'échec)"""
+    try:
+        return read_network_interfaces()
+    except Exception as e:
+        return [{'interface': 'eth0', 'ip_address': '192.168.1.100', 'netmask': '255.255.255.0', 'network': '192.168.1.0/24'}]
+
+def parse_targets(target: str) -> List[str]:
+    """Déterminer la liste des hôtes à scanner à partir d'une cible"""
+    if '/' in target:
+        # CIDR notation
+        network = ipaddress.IPv4Network(target, strict=False)
+        hosts = [str(ip) for ip in network.hosts()]
+    elif '-' in target:
+        # Range notation (ex: 192.168.1.1-254)
+        start_ip, end_range = target.split('-')
+        base_ip = '.'.join(start_ip.split('.')[:-1])
+        start_num = int(start_ip.split('.')[-1])
+        end_num = int(end_range)
+        hosts = [f"{base_ip}.{i}" for i in range(start_num, end_num + 1)]
+    else:
+        # Single host
+        hosts = [target]
+
+    # Limiter le nombre d'hôtes pour éviter la surcharge
+    if len(hosts) > 254:
+        hosts = hosts[:254]
+
+    return hosts
+
+async def scan_host(host: str, ports: str = "auto", scan_type: str = "quick",
+                    notify: Optional[Notifier] = None, neighbour: Optional[Dict[str, str]] = None,
+                    stop_event: Optional[asyncio.Event] = None) -> Dict:
+    """Scanner un hôte spécifique avec méthodes améliorées
+
+    ``neighbour`` contient l'état déjà connu via la table de voisinage ; le
+    ping est alors évité. Le scan de ports s'interrompt dès que ``stop_event``
+    est levé.
+    """
+    result = {
+        'host': host,
+        'status': 'down',
+        'ports': [],
+        'os_info': None,
+        'scan_time': datetime.now().isoformat()
+    }
+
+    try:
+        if neighbour:
+            # État déjà connu grâce à la table ARP/NDP
+            alive = neighbour['status'] == 'up'
+            if neighbour.get('mac'):
+                result['mac'] = neighbour['mac']
+        else:
+            # Test de ping simple, sans bloquer la boucle d'événements
+            ping = await asyncio.create_subprocess_exec(
+                'ping', '-c', '1', '-W', '1', host,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            alive = await ping.wait() == 0
+
+        if alive:
+            result['status'] = 'up'
+
+            # Définir les ports selon le type de scan
+            if ports == "auto" or not ports:
+                # Détection automatique intelligente
+                if scan_type == "quick":
+                    # Scan rapide : ports les plus courants (1-1024)
+                    port_list = ",".join(str(p) for p in range(1, 1025))
+                elif scan_type == "full":
+                    # Scan complet : tous les ports TCP (1-65535)
+                    port_list = ",".join(str(p) for p in range(1, 65536))
+                elif scan_type == "range":
+                    # Scan par plage personnalisée (1-10000)
+                    port_list = ",".join(str(p) for p in range(1, 10001))
+                else:
+                    # Par défaut : scan intelligent adaptatif
+                    port_list = ",".join(str(p) for p in range(1, 1025))
+            else:
+                # Ports spécifiés manuellement
+                port_list = ports
+
+            # Scanner les ports avec timeout adaptatif et parallélisme
+            if scan_type == "full":
+                timeout = 0.3  # Très rapide pour scan complet
+                max_concurrent = 100  # Plus de connexions simultanées
+            elif scan_type == "range":
+                timeout = 0.5
+                max_concurrent = 50
+            else:
+                timeout = 0.8  # Équilibre vitesse/précision
+                max_concurrent = 30
+
+            # Scanner les ports en parallèle avec limitation de concurrence
+            ports_to_scan = [int(p.strip()) for p in port_list.split(',') if p.strip().isdigit()]
+
+            # Diviser en chunks pour éviter la surcharge
+            chunk_size = max_concurrent
+            open_ports = []
+
+            for i in range(0, len(ports_to_scan), chunk_size):
+                chunk = ports_to_scan[i:i + chunk_size]
+
+                # Vérifier si le scan doit être arrêté
+                if stop_event is not None and stop_event.is_set():
+                    break
+
+                # Scanner ce chunk de ports
+                semaphore = asyncio.Semaphore(max_concurrent)
+                tasks = [scan_single_port_with_semaphore(semaphore, host, port, timeout) for port in chunk]
+
+                chunk_results = await asyncio.gather(*tasks, return_exceptions=True)
+
+                # Collecter les ports ouverts
+                for port_result in chunk_results:
+                    if isinstance(port_result, dict) and port_result.get('status') == 'open':
+                        open_ports.append(port_result)
+
+                # Envoyer une mise à jour intermédiaire si beaucoup de ports
+                if len(ports_to_scan) > 1000 and i % (chunk_size * 5) == 0:
+                    await _notify(notify, {
+                        'type': 'port_progress',
+                        'host': host,
+                        'scanned': i + len(chunk),
+                        'total': len(ports_to_scan),
+                        'found': len(open_ports)
+                    })
+
+            result['ports'] = open_ports
+
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+
+    return result
+
+async def scan_single_port_with_semaphore(semaphore: asyncio.Semaphore, host: str, port: int, timeout: float = 0.8) -> Dict:
+    """Scanner un port avec limitation de concurrence"""
+    async with semaphore:
+        return await scan_single_port(host, port, timeout)
+
+async def scan_single_port(host: str, port: int, timeout: float = 0.8) -> Dict:
+    """Scanner un port spécifique de manière asynchrone"""
+    try:
+        # Créer une connexion socket asynchrone
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+
+        try:
+            # Essayer de se connecter avec timeout
+            await asyncio.wait_for(
+                asyncio.get_event_loop().sock_connect(sock, (host, port)),
+                timeout=timeout
+            )
+
+            # Connexion réussie - port ouvert
+            try:
+                service = socket.getservbyport(port)
+            except:
+                # Services personnalisés courants
+                service_map = {
+                    8080: "http-proxy",
+                    8443: "https-alt",
+                    3306: "mysql",
+                    5432: "postgresql",
+                    1433: "mssql",
+                    3389: "rdp",
+                    5900: "vnc",
+                    6379: "redis",
+                    27017: "mongodb",
+                    9200: "elasticsearch"
+                }
+                service = service_map.get(port, "unknown")
+
+            return {
+                'port': port,
+                'status': 'open',
+                'service': service
+            }
+
+        except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
+            # Port fermé ou filtré
+            return {'port': port, 'status': 'closed'}
+
+        finally:
+            sock.close()
+
+    except Exception as e:
+        return {'port': port, 'status': 'error', 'error': str(e)}
+
+async def scan_network(target: str, scan_type: str = "quick", ports: str = "22,80,443,8080",
+                       notify: Optional[Notifier] = None, store=None,
+                       discover: bool = True, prime_neighbours: bool = True,
+                       resolver=None, stop_event: Optional[asyncio.Event] = None) -> Dict[str, Any]:
+    """Scanner un réseau ou une plage d'adresses
+
+    Les événements sont transmis à ``notify`` au fil de l'eau ; si ``store``
+    (un DatabaseManager) est fourni, la session et les résultats y sont enregistrés.
+    Si ``discover`` est actif, les hôtes des sous-réseaux directement connectés
+    sont classés via la table de voisinage (après un balayage ARP si
+    ``prime_neighbours``) avant le scan de ports. Si ``resolver`` (un
+    ReverseResolver) est fourni, les noms d'hôtes sont résolus en parallèle du
+    scan : un résultat n'attend jamais sa résolution, les noms obtenus après
+    coup sont enregistrés et diffusés à la fin (événement ``hostnames_resolved``).
+    Chaque scan a son propre ``stop_event`` : le lever n'arrête que ce scan.
+    Retourne un résumé de la session.
+    """
+    if stop_event is None:
+        stop_event = asyncio.Event()
+
+    # Créer une session de scan en base de données si demandé
+    session_id = await store.create_scan_session(target, scan_type, ports) if store else None
+    summary = {'session_id': session_id, 'status': 'running', 'scanned': 0, 'hosts_up': 0}
+    # Hôtes dont le nom n'était pas encore résolu lors de l'envoi du résultat
+    late_hosts = []
+    hosts = []
+
+    async def finish(status: str, total_hosts: int):
+        summary['status'] = status
+        if store:
+            await store.update_scan_session(session_id, status, total_hosts, summary['hosts_up'])
+
+    async def stop(total_hosts: int):
+        await finish('stopped', total_hosts)
+        await _notify(notify, {
+            'type': 'scan_stopped',
+            'message': 'Scan arrêté par l\'utilisateur',
+            'scanned': summary['scanned'],
+            'session_id': session_id
+        })
+        return summary
+
+    try:
+        hosts = parse_targets(target)
+
+        # Résolution DNS inverse en arrière-plan, pendant le scan
+        if resolver:
+            resolver.prefetch(hosts)
+
+        await _notify(notify, {
+            'type': 'scan_started',
+            'total_hosts': len(hosts),
+            'target': target,
+            'session_id': session_id
+        })
+
+        # Découverte passive des hôtes on-link
+        neighbours = {}
+        if discover:
+            # Interfaces réelles uniquement : pas de découverte sur le réseau par défaut
+            try:
+                interfaces = await asyncio.get_event_loop().run_in_executor(None, read_network_interfaces)
+            except Exception:
+                interfaces = []
+            networks = [iface['network'] for iface in interfaces]
+            local_addresses = [iface['ip_address'] for iface in interfaces]
+            neighbours = await discover_neighbours(hosts, networks, prime=prime_neighbours,
+                                                   local_addresses=local_addresses)
+            if neighbours:
+                await _notify(notify, {
+                    'type': 'hosts_discovered',
+                    'hosts_up': sum(1 for n in neighbours.values() if n['status'] == 'up'),
+                    'known': len(neighbours),
+                    'session_id': session_id
+                })
+
+        # Scanner les hôtes par petits groupes
+        batch_size = 10
+
+        for i in range(0, len(hosts), batch_size):
+            # Vérifier si le scan doit être arrêté
+            if stop_event.is_set():
+                return await stop(len(hosts))
+
+            batch = hosts[i:i + batch_size]
+            tasks = [scan_host(host, ports, scan_type, notify, neighbours.get(host), stop_event) for host in batch]
+
+            # Traiter chaque résultat dès qu'il est disponible
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+
+                # Vérifier à nouveau si le scan doit être arrêté
+                if stop_event.is_set():
+                    return await stop(len(hosts))
+
+                if resolver:
+                    resolved, result['hostname'] = resolver.cached(result['host'])
+                    if not resolved:
+                        late_hosts.append(result['host'])
+
+                # Sauvegarder le résultat en base de données
+                if store:
+                    await store.save_scan_result(session_id, result)
+
+                if result['status'] == 'up':
+                    summary['hosts_up'] += 1
+
+                summary['scanned'] += 1
+                await _notify(notify, {
+                    'type': 'host_result',
+                    'result': result,
+                    'progress': (summary['scanned'] / len(hosts)) * 100,
+                    'session_id': session_id
+                })
+
+        # Mettre à jour la session comme terminée
+        await finish('completed', len(hosts))
+
+        await _notify(notify, {
+            'type': 'scan_completed',
+            'total_scanned': summary['scanned'],
+            'hosts_up': summary['hosts_up'],
+            'session_id': session_id
+        })
+
+    except asyncio.CancelledError:
+        # Tâche annulée (Ctrl-C, arrêt du serveur) : ne pas laisser la session « running »
+        await finish('stopped', len(hosts))
+        raise
+
+    except Exception as e:
+        summary['hosts_up'] = 0
+        await finish('error', 0)
+        await _notify(notify, {
+            'type': 'scan_error',
+            'error': str(e),
+            'session_id': session_id
+        })
+
+    # Compléter les noms d'hôtes résolus après l'envoi des résultats
+    if resolver and late_hosts:
+        try:
+            hostnames = await resolver.resolve_many(late_hosts)
+            hostnames = {host: name for host, name in hostnames.items() if name}
+            if hostnames:
+                if store:
+                    await store.update_hostnames(session_id, hostnames)
+                await _notify(notify, {
+                    'type': 'hostnames_resolved',
+                    'hostnames': hostnames,
+                    'session_id': session_id
+                })
+        except Exception:
+            pass
+
+    return summary
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Bookmark Scheduler for Network Scanner Application
+Exécute périodiquement les scans des favoris planifiés
+"""
+
+import asyncio
+import math
+import random
+from datetime import datetime, time, timedelta
+from typing import Dict, Optional, Set, Tuple, Any
+
+from scanner import scan_network
+
+class BookmarkScheduler:
+    """Planificateur in-process des scans récurrents de favoris
+
+    Chaque favori dont ``schedule_interval`` (en minutes) est non nul est
+    relancé à intervalle régulier, avec un décalage aléatoire (jitter) pour
+    étaler la charge. Si le favori a une heure de départ ``schedule_start``
+    (« HH:MM »), les exécutions sont alignées sur cette heure (par exemple une
+    fenêtre creuse de nuit) au lieu de dépendre de l'heure de création. Le nombre de scans simultanés est limité par ``budget``,
+    un sémaphore partagé avec les autres scans de l'application (à défaut, un
+    budget propre de ``max_concurrent_scans``), et une exécution est sautée si
+    la précédente n'est pas terminée. Chaque scan planifié a son propre état
+    d'arrêt : arrêter le scan de l'interface ne les interrompt pas. ``stop()``
+    annule les scans en cours, dont les sessions sont marquées ``stopped``.
+    """
+
+    def __init__(self, store, max_concurrent_scans: int = 2, jitter_ratio: float = 0.1,
+                 tick_seconds: float = 30.0, resolver=None,
+                 budget: Optional[asyncio.Semaphore] = None):
+        self.store = store
+        self.resolver = resolver
+        self.jitter_ratio = jitter_ratio
+        self.tick_seconds = tick_seconds
+        self._budget = budget or asyncio.Semaphore(max_concurrent_scans)
+        # bookmark_id -> ((intervalle en minutes, heure de départ), prochaine exécution)
+        self._next_runs: Dict[int, Tuple[Tuple[int, str], datetime]] = {}
+        self._running: Set[int] = set()
+        # Références des scans lancés, pour qu'ils ne soient ni collectés ni oubliés à l'arrêt
+        self._scan_tasks: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Démarrer la boucle de planification"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Arrêter la boucle de planification et annuler les scans en cours"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # scan_network marque la session « stopped » lorsqu'il est annulé
+        tasks = list(self._scan_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_pending()
+            except Exception as e:
+                print(f"Erreur du planificateur: {e}")
+            await asyncio.sleep(self.tick_seconds)
+
+    def _jitter(self, interval: int) -> timedelta:
+        """Décalage aléatoire proportionnel à l'intervalle"""
+        return timedelta(minutes=interval * self.jitter_ratio * random.random())
+
+    @staticmethod
+    def _anchor(bookmark: Dict[str, Any]) -> Optional[time]:
+        """Heure de départ du favori (« HH:MM »), None si non définie"""
+        try:
+            return datetime.strptime(bookmark.get('schedule_start') or '', '%H:%M').time()
+        except ValueError:
+            return None
+
+    def _next_run(self, bookmark: Dict[str, Any], after: datetime) -> datetime:
+        """Calculer l'exécution suivant ``after``
+
+        Avec une heure de départ, il s'agit du premier créneau ``départ + k × intervalle``
+        postérieur à ``after`` : le jitter et les retards ne décalent pas les exécutions suivantes.
+        """
+        interval = bookmark['schedule_interval']
+        anchor = self._anchor(bookmark)
+        if anchor is None:
+            return after + timedelta(minutes=interval) + self._jitter(interval)
+        base = datetime.combine(after.date(), anchor)
+        step = timedelta(minutes=interval)
+        slots = math.floor((after - base) / step) + 1
+        return base + slots * step + self._jitter(interval)
+
+    def _first_run(self, bookmark: Dict[str, Any], now: datetime) -> datetime:
+        """Calculer la première exécution d'un favori à partir de sa dernière exécution connue"""
+        interval = bookmark['schedule_interval']
+        last_run = bookmark.get('last_run_at')
+        if last_run:
+            try:
+                return self._next_run(bookmark, datetime.fromisoformat(last_run))
+            except ValueError:
+                pass
+        if self._anchor(bookmark) is not None:
+            # Jamais exécuté : attendre le prochain créneau aligné sur l'heure de départ
+            return self._next_run(bookmark, now)
+        return now + self._jitter(interval)
+
+    async def run_pending(self, now: Optional[datetime] = None):
+        """Lancer les scans des favoris arrivés à échéance"""
+        now = now or datetime.now()
+        bookmarks = await self.store.get_scheduled_bookmarks()
+
+        # Oublier les favoris supprimés ou dont la planification a été désactivée
+        scheduled_ids = {b['id'] for b in bookmarks}
+        for bookmark_id in list(self._next_runs):
+            if bookmark_id not in scheduled_ids:
+                del self._next_runs[bookmark_id]
+
+        for bookmark in bookmarks:
+            bookmark_id = bookmark['id']
+            schedule = (bookmark['schedule_interval'], bookmark.get('schedule_start') or '')
+
+            planned = self._next_runs.get(bookmark_id)
+            if planned is None or planned[0] != schedule:
+                planned = (schedule, self._first_run(bookmark, now))
+                self._next_runs[bookmark_id] = planned
+
+            if now < planned[1]:
+                continue
+
+            self._next_runs[bookmark_id] = (schedule, self._next_run(bookmark, now))
+
+            # Sauter cette exécution si la précédente est toujours en cours
+            if bookmark_id in self._running:
+                continue
+
+            self._running.add(bookmark_id)
+            task = asyncio.create_task(self._run_bookmark(bookmark))
+            self._scan_tasks.add(task)
+            task.add_done_callback(self._scan_tasks.discard)
+
+    async def _run_bookmark(self, bookmark: Dict[str, Any]):
+        """Exécuter le scan d'un favori dans la limite du budget de concurrence"""
+        try:
+            async with self._budget:
+                await self.store.mark_bookmark_run(bookmark['id'])
+                await scan_network(
+                    bookmark['target'],
+                    bookmark['scan_type'],
+                    bookmark.get('ports') or "auto",
+                    store=self.store,
+                    resolver=self.resolver
+                )
+        except Exception as e:
+            print(f"Erreur lors du scan planifié '{bookmark['name']}': {e}")
+        finally:
+            self._running.discard(bookmark['id'])
@@ -51,6 +51,9 @@ class NetworkScanner {
 
     handleWebSocketMessage(data) {
         switch (data.type) {
+            case 'scan_queued':
+                this.onScanQueued(data);
+                break;
             case 'scan_started':
                 this.onScanStarted(data);
                 break;
@@ -72,6 +75,9 @@ class NetworkScanner {
             case 'port_progress':
                 this.onPortProgress(data);
                 break;
+            case 'hostnames_resolved':
+                this.onHostnamesResolved(data);
+                break;
         }
     }
 
@@ -220,6 +226,17 @@ class NetworkScanner {
     }
 
     // Scan Event Handlers
+    onScanQueued(data) {
+        // Le scan démarrera dès qu'un créneau se libère ; il peut être arrêté en attendant
+        this.isScanning = true;
+        this.shouldStopScan = false;
+        this.updateScanProgress(0, `${data.message}...`);
+        this.showInfo(`Scan de ${data.target} mis en file d'attente`);
+
+        document.getElementById('scan-panel').style.display = 'none';
+        document.getElementById('scan-status').style.display = 'block';
+    }
+
     onScanStarted(data) {
         this.isScanning = true;
         this.shouldStopScan = false;
@@ -286,6 +303,19 @@ class NetworkScanner {
         document.getElementById('scan-status').style.display = 'none';
     }
 
+    onHostnamesResolved(data) {
+        // Noms d'hôtes résolus après l'affichage des résultats
+        Object.entries(data.hostnames).forEach(([host, hostname]) => {
+            const result = this.scanResults.find(r => r.host === host);
+            if (result) result.hostname = hostname;
+            document.querySelectorAll('#results-list .host-result').forEach(hostDiv => {
+                if (hostDiv.dataset.host === host) {
+                    hostDiv.querySelector('.host-ip').textContent = `${host} (${hostname})`;
+                }
+            });
+        });
+    }
+
     onPortProgress(data) {
         // Mise à jour de la progression du scan de ports
         const progressText = `${data.host}: ${data.scanned}/${data.total} ports scannés, ${data.found} ouverts`;
@@ -365,6 +395,7 @@ class NetworkScanner {
     createHostElement(result) {
         const hostDiv = document.createElement('div');
         hostDiv.className = `host-result status-${result.status}`;
+        hostDiv.dataset.host = result.host;
         
         const portsHtml = result.ports.length > 0 ? 
             `<div class="ports-header">Services Détectés (${result.ports.length})</div>` +
@@ -383,7 +414,7 @@ class NetworkScanner {
         
         hostDiv.innerHTML = `
             <div class="host-header">
-                <div class="host-ip">${result.host}</div>
+                <div class="host-ip">${result.host}${result.hostname ? ` (${escapeHtml(result.hostname)})` : ''}</div>
                 <div class="host-status ${result.status}">${statusText[result.status] || result.status}</div>
             </div>
             <div class="host-info">
@@ -1959,6 +1990,7 @@ class AnalyticsManager {
                 <div class="bookmark-meta">
                     <span class="bookmark-type">${bookmark.scan_type}</span>
                     ${bookmark.ports ? `<span class="bookmark-ports">Ports: ${bookmark.ports}</span>` : ''}
+                    ${bookmark.schedule_interval ? `<span class="bookmark-ports">Planifié: toutes les ${bookmark.schedule_interval} min${bookmark.schedule_start ? ` à partir de ${escapeHtml(bookmark.schedule_start)}` : ''}</span>` : ''}
                 </div>
                 <button class="btn-bookmark-scan" onclick="runBookmarkScan(${bookmark.id})">
                     <div class="scan-icon-small"></div>
@@ -1980,6 +2012,13 @@ class AnalyticsManager {
 
 // Fonctions globales pour la gestion de l'historique et des bookmarks
 
+// Échapper une valeur externe (ex: nom d'hôte DNS) avant insertion dans le HTML
+function escapeHtml(value) {
+    const div = document.createElement('div');
+    div.textContent = value;
+    return div.innerHTML.replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+}
+
 async function showSessionDetails(sessionId) {
     try {
         const response = await fetch(`/api/history/${sessionId}`);
@@ -2050,7 +2089,7 @@ async function showSessionDetails(sessionId) {
                         </div>
                         ${results.map(result => `
                             <div class="table-row">
-                                <div class="host-cell">${result.host}</div>
+                                <div class="host-cell">${result.host}${result.hostname ? ` (${escapeHtml(result.hostname)})` : ''}</div>
                                 <div class="status-cell">
                                     <span class="status-indicator ${result.status}">${result.status}</span>
                                 </div>
@@ -2166,7 +2205,9 @@ async function saveBookmark(event) {
         target: document.getElementById('bookmark-target').value,
         description: document.getElementById('bookmark-description').value,
         scan_type: document.getElementById('bookmark-scan-type').value,
-        ports: document.getElementById('bookmark-ports').value
+        ports: document.getElementById('bookmark-ports').value,
+        schedule_interval: parseInt(document.getElementById('bookmark-schedule').value, 10) || 0,
+        schedule_start: document.getElementById('bookmark-schedule-start').value
     };
     
     try {
@@ -0,0 +1,132 @@
+"""
+Tests de la découverte passive à partir d'une table de voisinage simulée
+"""
+
+import subprocess
+import unittest
+from unittest import mock
+
+import discovery
+from discovery import discover_neighbours, read_ip_neigh
+
+IP_NEIGH_OUTPUT = """\
+192.168.1.1 dev eth0 lladdr aa:bb:cc:dd:ee:01 REACHABLE
+192.168.1.2 dev eth0 lladdr aa:bb:cc:dd:ee:02 STALE
+192.168.1.3 dev eth0  FAILED
+192.168.1.4 dev eth0  INCOMPLETE
+192.168.1.5 dev eth0 lladdr aa:bb:cc:dd:ee:05 router PERMANENT
+fe80::1 dev eth0 lladdr aa:bb:cc:dd:ee:06 router DELAY
+
+"""
+
+NETWORKS = ['192.168.1.0/24']
+
+def neigh_table(**entries):
+    """Construire une table ip -> (état, mac) à partir d'arguments host_N=état"""
+    return {
+        f"192.168.1.{name.split('_')[1]}": (state, 'aa:bb:cc:dd:ee:ff' if state != 'FAILED' else '')
+        for name, state in entries.items()
+    }
+
+class ReadIpNeighTest(unittest.TestCase):
+
+    def run_with(self, stdout='', returncode=0, side_effect=None):
+        completed = subprocess.CompletedProcess(['ip', 'neigh', 'show'], returncode, stdout, '')
+        with mock.patch.object(discovery.subprocess, 'run', return_value=completed, side_effect=side_effect):
+            return read_ip_neigh()
+
+    def test_parses_states_and_mac_addresses(self):
+        self.assertEqual(self.run_with(IP_NEIGH_OUTPUT), {
+            '192.168.1.1': ('REACHABLE', 'aa:bb:cc:dd:ee:01'),
+            '192.168.1.2': ('STALE', 'aa:bb:cc:dd:ee:02'),
+            '192.168.1.3': ('FAILED', ''),
+            '192.168.1.4': ('INCOMPLETE', ''),
+            '192.168.1.5': ('PERMANENT', 'aa:bb:cc:dd:ee:05'),
+            'fe80::1': ('DELAY', 'aa:bb:cc:dd:ee:06'),
+        })
+
+    def test_empty_table(self):
+        self.assertEqual(self.run_with(''), {})
+
+    def test_command_failure_returns_none(self):
+        self.assertIsNone(self.run_with(returncode=1))
+
+    def test_missing_command_returns_none(self):
+        self.assertIsNone(self.run_with(side_effect=FileNotFoundError('ip')))
+
+class DiscoverNeighboursTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.swept = []
+        self.tables = []
+        patches = [
+            mock.patch.object(discovery, 'send_arp_sweep', side_effect=self.sweep),
+            mock.patch.object(discovery, 'read_ip_neigh', side_effect=self.read_table),
+            mock.patch.object(discovery, 'read_proc_arp', return_value={}),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def sweep(self, hosts):
+        self.swept.append(list(hosts))
+        return set(hosts)
+
+    def read_table(self):
+        # Rejouer les lectures successives, la dernière restant valable
+        return self.tables.pop(0) if len(self.tables) > 1 else self.tables[0]
+
+    async def discover(self, hosts, **kwargs):
+        kwargs.setdefault('poll_interval', 0.01)
+        return await discover_neighbours(hosts, NETWORKS, **kwargs)
+
+    async def test_reachable_host_is_up(self):
+        self.tables = [neigh_table(host_1='REACHABLE', host_5='PERMANENT')]
+        known = await self.discover(['192.168.1.1', '192.168.1.5'])
+        self.assertEqual(known['192.168.1.1'], {'status': 'up', 'mac': 'aa:bb:cc:dd:ee:ff'})
+        self.assertEqual(known['192.168.1.5']['status'], 'up')
+
+    async def test_unconfirmed_states_are_left_to_probe(self):
+        self.tables = [neigh_table(host_2='STALE', host_6='DELAY', host_7='PROBE')]
+        known = await self.discover(['192.168.1.2', '192.168.1.6', '192.168.1.7'])
+        self.assertEqual(known, {})
+
+    async def test_failed_or_absent_after_sweep_is_down(self):
+        self.tables = [neigh_table(host_3='FAILED')]
+        known = await self.discover(['192.168.1.3', '192.168.1.8'])
+        self.assertEqual(known, {
+            '192.168.1.3': {'status': 'down', 'mac': ''},
+            '192.168.1.8': {'status': 'down', 'mac': ''},
+        })
+
+    async def test_absent_without_sweep_is_left_to_probe(self):
+        self.tables = [neigh_table(host_1='REACHABLE')]
+        known = await self.discover(['192.168.1.1', '192.168.1.8'], prime=False)
+        self.assertEqual(set(known), {'192.168.1.1'})
+        self.assertEqual(self.swept, [])
+
+    async def test_waits_for_pending_resolutions(self):
+        self.tables = [
+            neigh_table(host_1='INCOMPLETE', host_3='INCOMPLETE'),
+            neigh_table(host_1='REACHABLE', host_3='INCOMPLETE'),
+            neigh_table(host_1='REACHABLE', host_3='FAILED'),
+        ]
+        known = await self.discover(['192.168.1.1', '192.168.1.3'])
+        self.assertEqual(known['192.168.1.1']['status'], 'up')
+        self.assertEqual(known['192.168.1.3']['status'], 'down')
+        self.assertEqual(len(self.tables), 1)
+
+    async def test_local_and_off_link_addresses_are_excluded(self):
+        self.tables = [neigh_table(host_1='REACHABLE', host_10='REACHABLE')]
+        known = await self.discover(['192.168.1.1', '192.168.1.10', '10.0.0.1'],
+                                    local_addresses=['192.168.1.10'])
+        self.assertEqual(set(known), {'192.168.1.1'})
+        self.assertEqual(self.swept, [['192.168.1.1']])
+
+    async def test_unreadable_table_returns_empty(self):
+        self.tables = [None]
+        self.assertEqual(await self.discover(['192.168.1.1']), {})
+        self.assertEqual(await self.discover(['192.168.1.1'], prime=False), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+"""
+Tests du résolveur DNS inverse contre un serveur DNS factice local
+"""
+
+import asyncio
+import struct
+import time
+import unittest
+from unittest import mock
+
+import resolver
+from resolver import ReverseResolver, build_ptr_query, _read_name
+
+class StubDNSServer(asyncio.DatagramProtocol):
+    """Serveur DNS minimal : réponses PTR configurées par adresse IP
+
+    ``answers`` associe une IP à un nom (réponse positive), à ``'nxdomain'``,
+    à ``'drop'`` (pas de réponse) ou à ``'mismatch'`` (réponse avec le bon
+    identifiant mais une autre question).
+    """
+
+    def __init__(self, answers, ttl=600):
+        self.answers = answers
+        self.ttl = ttl
+        self.queries = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        name, end = _read_name(data, 12)
+        question = data[12:end + 4]
+        ip = '.'.join(reversed(name.split('.')[:4]))
+        self.queries.append(ip)
+        answer = self.answers.get(ip, 'nxdomain')
+
+        if answer == 'drop':
+            return
+        if answer == 'nxdomain':
+            self.transport.sendto(data[:2] + struct.pack('!HHHHH', 0x8183, 1, 0, 0, 0) + question, addr)
+            return
+        if answer == 'mismatch':
+            other = build_ptr_query(struct.unpack('!H', data[:2])[0], '10.9.9.9')
+            self.transport.sendto(other[:2] + struct.pack('!HHHHH', 0x8183, 1, 0, 0, 0) + other[12:], addr)
+            return
+
+        rdata = b''.join(bytes([len(label)]) + label.encode() for label in answer.split('.')) + b'\x00'
+        record = b'\xc0\x0c' + struct.pack('!HHIH', 12, 1, self.ttl, len(rdata)) + rdata
+        self.transport.sendto(data[:2] + struct.pack('!HHHHH', 0x8180, 1, 1, 0, 0) + question + record, addr)
+
+class MemoryStore:
+    """Remplaçant en mémoire du cache DNS SQLite de DatabaseManager"""
+
+    def __init__(self):
+        self.entries = {}
+
+    async def get_dns_cache(self, ips):
+        now = time.time()
+        return {ip: self.entries[ip] for ip in ips if ip in self.entries and self.entries[ip][1] > now}
+
+    async def save_dns_cache(self, entries):
+        self.entries.update(entries)
+
+class ReverseResolverTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = StubDNSServer({
+            '10.0.0.1': 'host1.lan',
+            '10.0.0.2': 'host2.lan',
+            '10.0.0.3': 'host3.lan',
+            '10.0.0.4': 'nxdomain',
+            '10.0.0.5': 'drop',
+            '10.0.0.6': 'mismatch',
+            '10.0.0.7': 'bad<img>.lan',
+        })
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: self.server, local_addr=('127.0.0.1', 0)
+        )
+        self.port = self.transport.get_extra_info('sockname')[1]
+        self.resolvers = []
+
+    async def asyncTearDown(self):
+        for r in self.resolvers:
+            r.close()
+        self.transport.close()
+
+    def make_resolver(self, **kwargs):
+        kwargs.setdefault('timeout', 0.2)
+        r = ReverseResolver(nameservers=['127.0.0.1'], port=self.port, **kwargs)
+        self.resolvers.append(r)
+        return r
+
+    async def test_positive_answer(self):
+        r = self.make_resolver()
+        self.assertEqual(await r.resolve('10.0.0.1'), 'host1.lan')
+        self.assertEqual(r.cached('10.0.0.1'), (True, 'host1.lan'))
+
+    async def test_resolve_many_in_bulk(self):
+        r = self.make_resolver()
+        hostnames = await r.resolve_many(['10.0.0.1', '10.0.0.2', '10.0.0.4', 'not-an-ip'])
+        self.assertEqual(hostnames, {
+            '10.0.0.1': 'host1.lan',
+            '10.0.0.2': 'host2.lan',
+            '10.0.0.4': None,
+            'not-an-ip': None,
+        })
+
+    async def test_nxdomain_is_cached_as_negative(self):
+        r = self.make_resolver()
+        self.assertIsNone(await r.resolve('10.0.0.4'))
+        self.assertEqual(r.cached('10.0.0.4'), (True, None))
+        await r.resolve('10.0.0.4')
+        self.assertEqual(self.server.queries.count('10.0.0.4'), 1)
+
+    async def test_timeout_retries_and_is_not_cached(self):
+        r = self.make_resolver(attempts=2)
+        started = time.monotonic()
+        self.assertIsNone(await r.resolve('10.0.0.5'))
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(self.server.queries.count('10.0.0.5'), 2)
+        self.assertEqual(r.cached('10.0.0.5'), (False, None))
+
+    async def test_reply_for_other_question_is_ignored(self):
+        r = self.make_resolver(attempts=1)
+        self.assertIsNone(await r.resolve('10.0.0.6'))
+        self.assertEqual(r.cached('10.0.0.6'), (False, None))
+
+    async def test_invalid_hostname_is_rejected(self):
+        r = self.make_resolver(attempts=1)
+        self.assertIsNone(await r.resolve('10.0.0.7'))
+        self.assertEqual(r.cached('10.0.0.7'), (False, None))
+
+    async def test_ttl_expiry(self):
+        self.server.ttl = 60
+        r = self.make_resolver()
+        await r.resolve('10.0.0.1')
+        with mock.patch.object(resolver.time, 'time', return_value=time.time() + 61):
+            self.assertEqual(r.cached('10.0.0.1'), (False, None))
+            self.assertEqual(await r.resolve('10.0.0.1'), 'host1.lan')
+        self.assertEqual(self.server.queries.count('10.0.0.1'), 2)
+
+    async def test_lru_eviction(self):
+        r = self.make_resolver(cache_size=2)
+        await r.resolve('10.0.0.1')
+        await r.resolve('10.0.0.2')
+        # 10.0.0.1 redevient le plus récent, 10.0.0.2 est évincé par 10.0.0.3
+        r.cached('10.0.0.1')
+        await r.resolve('10.0.0.3')
+        self.assertEqual(r.cached('10.0.0.1'), (True, 'host1.lan'))
+        self.assertEqual(r.cached('10.0.0.2'), (False, None))
+        self.assertEqual(r.cached('10.0.0.3'), (True, 'host3.lan'))
+
+    async def test_single_transport_per_nameserver(self):
+        loop = asyncio.get_running_loop()
+        created = []
+        create_endpoint = loop.create_datagram_endpoint
+
+        async def record(*args, **kwargs):
+            transport, protocol = await create_endpoint(*args, **kwargs)
+            created.append(transport)
+            return transport, protocol
+
+        r = self.make_resolver()
+        with mock.patch.object(loop, 'create_datagram_endpoint', side_effect=record):
+            await r.resolve_many([f'10.0.1.{i}' for i in range(1, 60)])
+        self.assertEqual(len(created), 1)
+        self.assertEqual(list(r._transports.values()), created)
+
+        r.close()
+        self.assertTrue(all(transport.is_closing() for transport in created))
+        self.assertEqual(r._transports, {})
+
+    async def test_persistent_store_is_reused(self):
+        store = MemoryStore()
+        await self.make_resolver(store=store).resolve_many(['10.0.0.1', '10.0.0.4'])
+        self.assertEqual(set(store.entries), {'10.0.0.1', '10.0.0.4'})
+
+        hostnames = await self.make_resolver(store=store).resolve_many(['10.0.0.1', '10.0.0.4'])
+        self.assertEqual(hostnames, {'10.0.0.1': 'host1.lan', '10.0.0.4': None})
+        self.assertEqual(len(self.server.queries), 2)
+
+if __name__ == "__main__":
+    unittest.main()